@@ -1,21 +1,34 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import os, sys, json, time, random, traceback
+import os, sys, json, time, random, argparse, logging
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from telegram_all_tips_ticket import build_tickets_and_reasoning, post_to_telegram
 
 TIMEZONE = os.getenv("TIMEZONE", "Europe/Belgrade")
 TZ = ZoneInfo(TIMEZONE)
 
-def debug(msg: str):
-    print(f"[DEBUG] {datetime.now(TZ).strftime('%H:%M:%S')} | {msg}", flush=True)
+# Shares the builder's handler. Progress lines are INFO; -v (or DEBUG=1/LOG_LEVEL)
+# adds the DEBUG detail from both loggers.
+log = logging.getLogger("main")
 
-def main() -> None:
-    debug("=== START main.py run ===")
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Build today's tickets and post them to Telegram.")
+    ap.add_argument("--no-cache", action="store_true", help="ignore and don't write the on-disk API cache")
+    ap.add_argument("-v", "--verbose", action="store_true", help="debug logging for this run")
+    args = ap.parse_args(argv)
+    # The builder reads its settings and resolves league ids (through the cache) on
+    # import, so the flags go into the environment before it is imported.
+    if args.verbose:
+        os.environ["LOG_LEVEL"] = "DEBUG"
+    if args.no_cache:
+        os.environ["API_CACHE_DIR"] = ""
+    from telegram_all_tips_ticket import DEBUG_ON, LOG_LEVEL, build_tickets_and_reasoning, post_to_channels
+    log.setLevel(LOG_LEVEL if DEBUG_ON or os.getenv("LOG_LEVEL") else logging.INFO)
+
+    log.debug("=== START main.py run ===")
     try:
         date_str = datetime.now(TZ).strftime("%Y-%m-%d")
-        debug(f"Using date: {date_str}")
+        log.debug("Using date: %s", date_str)
 
         api = os.getenv("API_FOOTBALL_KEY")
         tele = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -23,34 +36,33 @@ def main() -> None:
         chans = [c.strip() for c in chans_raw.replace("\n", ",").split(",") if c.strip()]
         openai_key = os.getenv("OPENAI_API_KEY")
 
-        debug(f"API_FOOTBALL_KEY present: {bool(api)}")
-        debug(f"OPENAI_API_KEY present: {bool(openai_key)}")
-        debug(f"TELEGRAM_BOT_TOKEN present: {bool(tele)}")
-        debug(f"Channels: {chans}")
+        log.debug("API_FOOTBALL_KEY present: %s", bool(api))
+        log.debug("OPENAI_API_KEY present: %s", bool(openai_key))
+        log.debug("TELEGRAM_BOT_TOKEN present: %s", bool(tele))
+        log.debug("Channels: %s", chans)
 
         tickets, reasonings = build_tickets_and_reasoning(date_str=date_str, debug=True)
-        debug(f"Tickets built: {len(tickets)}")
+        log.info("Tickets built: %d", len(tickets))
 
         results = []
         if not tickets:
-            debug("⚠️ No tickets were generated.")
+            log.warning("⚠️ No tickets were generated.")
         else:
             for idx, (ticket_text, reasoning) in enumerate(zip(tickets, reasonings), start=1):
                 msg = f"{ticket_text}\n\n🧠 Reasoning:\n{reasoning}".strip()
-                debug(f"Sending Ticket #{idx} ({len(msg)} chars)")
-                for ch in chans:
-                    ok, resp = post_to_telegram(message=msg, channel=ch)
-                    debug(f"→ Channel {ch}: ok={ok}, resp={str(resp)[:120]}")
+                log.debug("Sending Ticket #%d (%d chars)", idx, len(msg))
+                for ch, ok, resp in post_to_channels(msg, chans):
+                    log.info("→ Channel %s: ok=%s, resp=%.120s", ch, ok, resp)
                     results.append({"ticket": idx, "channel": ch, "ok": ok, "resp": resp})
-                    time.sleep(0.6 + random.random() * 0.4)
+                time.sleep(0.6 + random.random() * 0.4)
 
         payload = {"sent": results, "tickets": len(tickets)}
-        debug(f"Finished. Payload summary:\n{json.dumps(payload, ensure_ascii=False, indent=2)}")
-        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        summary = json.dumps(payload, ensure_ascii=False, indent=2)
+        log.debug("Finished. Payload summary:\n%s", summary)
+        print(summary)
 
     except Exception as e:
-        debug(f"❌ Exception: {e}")
-        traceback.print_exc()
+        log.exception("❌ Exception: %s", e)
 
 if __name__ == "__main__":
     main()
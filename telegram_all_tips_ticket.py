@@ -2,17 +2,34 @@
 # Self-contained builder for two tickets + Telegram poster.
 from __future__ import annotations
 
-import os, json, time, random, re
-from typing import Any, Dict, List, Tuple, Optional
-from datetime import datetime, timezone
+import os, io, json, time, random, re, threading, heapq, math, atexit, hashlib, logging
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Tuple, Optional
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from concurrent.futures import ThreadPoolExecutor
 import httpx
 
+try:  # faster JSON for the large odds payloads; stdlib json works the same, just slower
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 # ===== ENV =====
-API_BASE   = os.getenv("API_FOOTBALL_URL", "https://v3.football.api-sports.io")
+API_BASE   = os.getenv("API_FOOTBALL_URL", "https://v3.football.api-sports.io").rstrip("/")
 API_KEY    = os.getenv("API_FOOTBALL_KEY", "").strip() or os.getenv("X_APISPORTS_KEY", "").strip()
 TIMEZONE   = os.getenv("TIMEZONE", "Europe/Belgrade")
 OPENAI_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL = os.getenv("OPENAI_MODEL","gpt-4.1-mini").strip()
+OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.3"))
 
 TELE_BOT   = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
 
@@ -20,46 +37,198 @@ LEGS_MIN   = int(os.getenv("LEGS_MIN", "2"))
 LEGS_MAX   = int(os.getenv("LEGS_MAX", "6"))
 MAX_MATCHES= int(os.getenv("MAX_MATCHES", "180"))
 QPS_DELAY  = float(os.getenv("QPS_DELAY", "0.35"))
-DEBUG_ON   = os.getenv("DEBUG", "1") not in ("0","false","False","no","No")
+API_RPS    = float(os.getenv("API_RPS", "0") or 0) or (1.0 / QPS_DELAY if QPS_DELAY > 0 else 0.0)
+API_BURST  = float(os.getenv("API_BURST", "4"))
+ODDS_WORKERS = max(1, int(os.getenv("ODDS_WORKERS", "8")))
+ODDS_CALL_BUDGET = int(os.getenv("ODDS_CALL_BUDGET", "0"))   # 0 = unlimited
+ODDS_MIN_BOOKS = int(os.getenv("ODDS_MIN_BOOKS", "3"))       # 0 = read every bookmaker
+API_CACHE_DIR = os.getenv("API_CACHE_DIR", ".apicache").strip()
+DEBUG_ON   = os.getenv("DEBUG", "0") not in ("0","false","False","no","No","")
 QUIET      = os.getenv("QUIET","0") in ("1","true","True")
 
-SKIP_STATUS= {"FT","AET","PEN","PST","CANC","ABD","AWD","WO","SUSP","INT"}
+# Shared read-only stand-in for missing nested API objects (avoids a fresh {} per miss).
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
 
-def dbg(msg: str):
-    if DEBUG_ON and not QUIET:
-        now = datetime.now().strftime("%H:%M:%S")
-        print(f"[DBG] {now} | {msg}", flush=True)
+SKIP_STATUS: frozenset[str] = frozenset({"FT","AET","PEN","PST","CANC","ABD","AWD","WO","SUSP","INT"})
 
-def _sleep():
-    time.sleep(QPS_DELAY + random.uniform(0.0, 0.08))
+# Debug output goes through logging so disabled messages cost a level check, not a
+# formatted print. Quiet (WARNING) unless DEBUG=1; LOG_LEVEL overrides both switches.
+LOG_LEVEL  = os.getenv("LOG_LEVEL", "").strip().upper() or ("DEBUG" if DEBUG_ON and not QUIET else "WARNING")
+log = logging.getLogger(__name__)
+log.setLevel(LOG_LEVEL)
+logging.basicConfig(format="[%(levelname)s] %(asctime)s | %(message)s", datefmt="%H:%M:%S")
 
 # ===== HTTP CORE =====
-_http_cache: Dict[str, Any] = {}
+class TokenBucket:
+    """Thread-safe token bucket: only blocks when calls outpace `rate` per second."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill()
+            if self.tokens < 1.0:
+                time.sleep((1.0 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1.0
+
+_bucket = TokenBucket(API_RPS, API_BURST)
+_http_cache: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Any] = {}
+
+API_RETRIES = int(os.getenv("API_RETRIES", "4"))
+# Seconds before retry n (last entry repeats); jitter is added on top.
+BACKOFF: Tuple[float, ...] = (0.5, 1, 2, 4, 8, 16, 30)
+# Upper bound on a server-requested Retry-After wait, so one header cannot stall a run.
+RETRY_AFTER_MAX = 60.0
+
+_HTTP_LIMITS = httpx.Limits(max_connections=ODDS_WORKERS + 4, max_keepalive_connections=ODDS_WORKERS + 4)
+_clients: Dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+def _shared_client(name: str, **kwargs: Any) -> httpx.Client:
+    """Process-wide keep-alive client per host, created on first use and closed at exit."""
+    with _clients_lock:
+        c = _clients.get(name)
+        if c is None:
+            c = _clients[name] = httpx.Client(limits=_HTTP_LIMITS, **kwargs)
+            atexit.register(c.close)
+        return c
 
 def _client() -> httpx.Client:
     if not API_KEY:
         raise RuntimeError("Missing API_FOOTBALL_KEY or X_APISPORTS_KEY")
-    return httpx.Client(base_url=API_BASE, headers={"x-apisports-key": API_KEY}, timeout=40)
+    return _shared_client("api-football", base_url=API_BASE, headers={"x-apisports-key": API_KEY}, timeout=40)
+
+# ===== DISK CACHE (survives between runs; empty API_CACHE_DIR disables it) =====
+# Seconds a stored response stays fresh, per endpoint. Unlisted paths are not stored.
+_DISK_TTL: Dict[str, float] = {"/fixtures": 3600, "/odds": 600, "/leagues": 86400}
+
+# A date's late kickoffs finish after midnight UTC; only snapshots taken this long
+# after the day ended are treated as final.
+DAY_SETTLE_GRACE = 6 * 3600
+
+def _disk_ttl(path: str, params: Dict[str, Any]) -> Tuple[float, Optional[float]]:
+    """(ttl, settled_at) for a request. A stored entry written at or after `settled_at`
+    (epoch seconds) never expires: its day was over, so fixtures and odds were final."""
+    ttl = _DISK_TTL.get(path, 0)
+    day = params.get("date")
+    if not ttl or not isinstance(day, str):
+        return ttl, None
+    try:
+        day_end = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
+    except ValueError:
+        return ttl, None
+    return ttl, day_end.timestamp() + DAY_SETTLE_GRACE
 
-def _get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    key = f"GET::{path}::{json.dumps(params, sort_keys=True)}"
-    if key in _http_cache:
-        return _http_cache[key]
-    _sleep()
+def _disk_path(key: Tuple[Any, ...]) -> Optional[str]:
+    if not API_CACHE_DIR:
+        return None
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(API_CACHE_DIR, f"{digest}.json")
+
+def _disk_load(key: Tuple[Any, ...], ttl: float, settled_at: Optional[float] = None) -> Optional[Any]:
+    path = _disk_path(key)
+    if not path or ttl <= 0:
+        return None
     try:
-        with _client() as c:
-            r = c.get(path, params=params)
-            r.raise_for_status()
-            data = r.json()
+        mtime = os.path.getmtime(path)
+        if (settled_at is None or mtime < settled_at) and time.time() - mtime > ttl:
+            return None
+        with open(path, "rb") as fh:
+            return _json_loads(fh.read())
+    except (OSError, ValueError):
+        return None
 
-            # API sometimes returns a 200 with an embedded error payload. Surface it clearly
-            # so the caller (or CI logs) show a direct hint about the missing/invalid token.
-            errs = data.get("errors") if isinstance(data, dict) else None
-            if errs:
-                raise RuntimeError(f"API error response: {errs}")
+def _disk_store(key: Tuple[Any, ...], data: Any) -> None:
+    path = _disk_path(key)
+    if not path:
+        return
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(API_CACHE_DIR, exist_ok=True)
+        with open(tmp, "wb") as fh:
+            fh.write(_json_dumps(data))
+        os.replace(tmp, path)
+    except OSError as exc:
+        log.debug("Disk cache write failed for %s: %s", path, exc)
+
+def _backoff(attempt: int) -> float:
+    return BACKOFF[min(attempt, len(BACKOFF) - 1)] + random.uniform(0.0, 0.25)
+
+def _retry_after(r: httpx.Response) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, capped at RETRY_AFTER_MAX; None if absent."""
+    try:
+        return min(max(float(r.headers["Retry-After"]), 0.0), RETRY_AFTER_MAX)
+    except (KeyError, ValueError):
+        return None
 
+def _fetch_with_retry(path: str, params: Dict[str, Any]) -> httpx.Response:
+    """Rate-limited GET that retries 429/5xx and transport errors up to API_RETRIES times.
+
+    A 429/503 carrying Retry-After waits exactly that long instead of the backoff table.
+    """
+    c = _client()
+    attempt = 0
+    while True:
+        _bucket.acquire()
+        delay = None
+        try:
+            r = c.get(path, params=params)
+            if (r.status_code != 429 and r.status_code < 500) or attempt >= API_RETRIES:
+                return r
+            delay = _retry_after(r)
+            log.debug("GET %s -> %d; retry %d", path, r.status_code, attempt + 1)
+        except httpx.TransportError as exc:
+            if attempt >= API_RETRIES:
+                raise
+            log.debug("GET %s failed (%s); retry %d", path, exc, attempt + 1)
+        time.sleep(_backoff(attempt) if delay is None else delay)
+        attempt += 1
+
+def _get(path: str, params: Dict[str, Any], *, memo: bool = True) -> Dict[str, Any]:
+    """GET an API-Football endpoint. memo=False skips the in-memory cache for callers
+    that keep their own reduced copy of the response (raw odds payloads are large)."""
+    key = (path, tuple(sorted(params.items())))
+    if key in _http_cache:
+        return _http_cache[key]
+    ttl, settled_at = _disk_ttl(path, params)
+    data = _disk_load(key, ttl, settled_at)
+    if data is not None:
+        if memo:
+            _http_cache[key] = data
+        return data
+    r = _fetch_with_retry(path, params)
+    try:
+        r.raise_for_status()
+        try:
+            data = _json_loads(r.content)
+        except ValueError as exc:
+            # Same failure class as an HTTP error, so callers' fallbacks cover it too.
+            raise RuntimeError(f"Invalid JSON from {path}: {exc}") from exc
+
+        # API sometimes returns a 200 with an embedded error payload. Surface it clearly
+        # so the caller (or CI logs) show a direct hint about the missing/invalid token.
+        errs = data.get("errors") if isinstance(data, dict) else None
+        if errs:
+            raise RuntimeError(f"API error response: {errs}")
+
+        if memo:
             _http_cache[key] = data
-            return data
+        if ttl > 0:
+            _disk_store(key, data)
+        return data
     except httpx.HTTPStatusError as exc:
         body = None
         try:
@@ -68,15 +237,22 @@ def _get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
             body = exc.response.text
         raise RuntimeError(f"HTTP error {exc.response.status_code} for {path}: {body}") from exc
 
+try:
+    _TZ = ZoneInfo(TIMEZONE)
+except (ZoneInfoNotFoundError, ValueError):
+    log.warning("Unknown TIMEZONE %r; kickoff times stay in UTC", TIMEZONE)
+    _TZ = timezone.utc
+
+@lru_cache(maxsize=1024)
 def _fmt_dt_local(iso_str: str) -> str:
     try:
-        dt = datetime.fromisoformat(iso_str.replace("Z","+00:00"))
+        dt = datetime.fromisoformat(iso_str.replace("Z","+00:00")).astimezone(_TZ)
         return dt.strftime("%Y-%m-%d %H:%M")
     except Exception:
         return iso_str
 
 # ===== Allow leagues =====
-PREFERRED_LEAGUES: set[Tuple[str,str]] = {
+PREFERRED_LEAGUES: frozenset[Tuple[str,str]] = frozenset({
     ("England","Premier League"),
     ("England","Championship"),
     ("France","Ligue 1"),
@@ -86,9 +262,9 @@ PREFERRED_LEAGUES: set[Tuple[str,str]] = {
     ("Netherlands","Eredivisie"),
     ("Serbia","Super Liga"),
     ("Turkey","Super Lig"),
-}
+})
 
-ALLOW_LIST_STATIC: set[int] = {
+ALLOW_LIST_STATIC: frozenset[int] = frozenset({
     39,   # Premier League
     140,  # La Liga
     135,  # Serie A
@@ -110,7 +286,7 @@ ALLOW_LIST_STATIC: set[int] = {
     136,
     736,
     207,
-}
+})
 
 def _leagues_search(name: str, country: Optional[str]) -> List[Dict[str, Any]]:
     data = _get("/leagues", {"search": name})
@@ -126,32 +302,36 @@ def _leagues_search(name: str, country: Optional[str]) -> List[Dict[str, Any]]:
             out.append({"id": lg.get("id"), "name": lg.get("name"), "country": cc})
     return out
 
-def resolve_allow_ids() -> set[int]:
-    ids: set[int] = {int(x) for x in ALLOW_LIST_STATIC}
+def resolve_allow_ids() -> frozenset[int]:
+    ids: set[int] = set(ALLOW_LIST_STATIC)
 
     if not API_KEY:
-        dbg("ALLOW_IDS using static list because API key is missing")
-        return ids
+        log.debug("ALLOW_IDS using static list because API key is missing")
+        return ALLOW_LIST_STATIC
 
     try:
         for country, name in sorted(PREFERRED_LEAGUES):
             res = _leagues_search(name, country)
             if not res:
-                dbg(f"RESOLVE miss: {country} — {name}")
+                log.debug("RESOLVE miss: %s — %s", country, name)
             for r in res:
                 if r.get("id"):
                     ids.add(int(r["id"]))
     except httpx.HTTPError as exc:
-        dbg(f"ALLOW_IDS falling back to static list due to API failure: {exc}")
-        return ids
+        log.debug("ALLOW_IDS falling back to static list due to API failure: %s", exc)
+        return frozenset(ids)
     except Exception as exc:
-        dbg(f"ALLOW_IDS falling back to static list due to unexpected error: {exc}")
-        return ids
+        log.debug("ALLOW_IDS falling back to static list due to unexpected error: %s", exc)
+        return frozenset(ids)
 
-    dbg(f"ALLOW_IDS resolved total={len(ids)} sample={sorted(list(ids))[:40]}")
-    return ids
+    log.debug("ALLOW_IDS resolved total=%d sample=%s", len(ids), sorted(ids)[:40])
+    return frozenset(ids)
 
-ALLOW_IDS: set[int] = resolve_allow_ids()
+ALLOW_IDS: frozenset[int] = resolve_allow_ids()
+
+def _league_in_prio(f: Fixture) -> bool:
+    # Name match covers preferred leagues whose id could not be resolved (static fallback).
+    return f.league_id in ALLOW_IDS or (f.country, f.league) in PREFERRED_LEAGUES
 
 # ===== Markets =====
 MARKET_BANDS = {
@@ -176,13 +356,23 @@ ALLOW_ALL_CAPS_RELAX = {
     ("Home Team Goals","Over 0.5"): 1.25,
     ("Away Team Goals","Over 0.5"): 1.30,
 }
+# Scanners walk these per fixture; flatten once instead of calling .items() every time.
+# Bands are ordered by upper bound, highest first, so _best_from_bands can stop early.
+_BAND_ITEMS = tuple(sorted(MARKET_BANDS.items(), key=lambda kv: -kv[1][1]))
+_RELAXED_BAND_ITEMS = tuple(sorted(RELAXED_BANDS.items(), key=lambda kv: -kv[1][1]))
+# A band pick this close to its cap cannot be beaten by more than the remaining slack.
+EARLY_ACCEPT = 0.95
+_CAP_ITEMS_HARD = tuple(ALLOW_ALL_CAPS_HARD.items())
+_CAP_ITEMS_RELAX = tuple(ALLOW_ALL_CAPS_RELAX.items())
+
+# Every (market, selection) either ticket can pick; odds parsing may stop once these are covered.
+WANTED_MARKETS: frozenset[Tuple[str,str]] = frozenset(MARKET_BANDS) | frozenset(ALLOW_ALL_CAPS_HARD)
+_WANTED_MARKET_NAMES: frozenset[str] = frozenset(mkt for mkt, _ in WANTED_MARKETS)
+
+MIN_T1_TOTAL = 2.0
 MIN_T2_TOTAL = 1.85
-
-FORBIDDEN_SUBSTRS = [
-    "asian","alternative","corners","cards","booking","penalties","penalty",
-    "offside","throw in","interval","race to","period","quarter","to qualify",
-    "overtime","extra time","win to nil","clean sheet","anytime","player","scorer",
-]
+# Stop probing fixtures once the pool is this much past what a ticket needs.
+EARLY_EXIT_MARGIN = 1.10
 
 DOC_MARKETS = {
     "match_winner": {"Match Winner","1X2","Full Time Result","Result"},
@@ -195,308 +385,455 @@ DOC_MARKETS = {
     "ttg_generic": {"Team Total Goals","Total Team Goals","Team Goals"},
 }
 
-def _is_fulltime_main(name: str) -> bool:
-    nl=(name or "").lower()
-    return not any(b in nl for b in FORBIDDEN_SUBSTRS)
+# Bet name (lowercased) -> DOC_MARKETS kind; one dict hit classifies a bet or rules it out.
+_BETNAME_TO_KIND: Dict[str, str] = {alias.lower(): kind for kind, aliases in DOC_MARKETS.items() for alias in aliases}
+_OVER05_RE = re.compile(r"\bover\s*0\.5\b", re.IGNORECASE)
+
+# API-Football sends odds as decimal strings ("1.85"); anything else is treated as missing.
+_ODD_RE = re.compile(r"\s*(\d+(?:\.\d*)?)\s*")
+
+# The same few hundred price strings recur across bookmakers; parse each one once.
+@lru_cache(maxsize=4096)
+def _parse_odd_str(x: str) -> float:
+    m = _ODD_RE.fullmatch(x)
+    return float(m.group(1)) if m else 0.0
 
 def _try_float(x: Any) -> Optional[float]:
-    try:
-        v=float(x); return v if v>0 else None
-    except Exception:
+    t = type(x)
+    if t is str:
+        v = _parse_odd_str(x)
+    elif t is float or t is int:
+        v = float(x)
+    else:
         return None
+    return v if v > 0 else None
+
+# Flat per-fixture odds view: (market, selection) -> best odd across bookmakers.
+OddsMap = Dict[Tuple[str, str], float]
+
+def _put_max(slot: OddsMap, key: Tuple[str, str], odd: Any) -> None:
+    # Keep the best price seen for `key` across bookmakers.
+    v = _try_float(odd)
+    if v is not None:
+        cur = slot.get(key)
+        if cur is None or v > cur:
+            slot[key] = v
+
+# Old-format bet handlers, one per DOC_MARKETS kind: pick the wanted values into `slot`.
+VALUE_TITLE_SET: frozenset[str] = frozenset({"Over 1.5", "Under 3.5", "Over 2.5"})
+_DC_VALUES: frozenset[str] = frozenset({"1X", "X2", "12"})
+_BTTS_VALUES: frozenset[str] = frozenset({"Yes", "No"})
+
+def _h_match_winner(slot: OddsMap, values) -> None:
+    for val in values:
+        nm=(val.get("value") or "").strip()
+        if nm in ("Home","1"):
+            _put_max(slot, ("Match Winner", "Home"), val.get("odd"))
+        elif nm in ("Away","2"):
+            _put_max(slot, ("Match Winner", "Away"), val.get("odd"))
+
+def _h_double_chance(slot: OddsMap, values) -> None:
+    for val in values:
+        nm=(val.get("value") or "").replace(" ","").upper()
+        if nm in _DC_VALUES:
+            _put_max(slot, ("Double Chance", nm), val.get("odd"))
+
+def _h_btts(slot: OddsMap, values) -> None:
+    for val in values:
+        nm=(val.get("value") or "").strip().title()
+        if nm in _BTTS_VALUES:
+            _put_max(slot, ("Both Teams To Score", nm), val.get("odd"))
+
+def _h_over_under(slot: OddsMap, values) -> None:
+    for val in values:
+        nm=(val.get("value") or "").strip().title().replace("Over1.5","Over 1.5").replace("Under3.5","Under 3.5").replace("Over2.5","Over 2.5")
+        if nm in VALUE_TITLE_SET:
+            _put_max(slot, ("Over/Under", nm), val.get("odd"))
+
+def _over05_handler(key: Tuple[str, str]):
+    def handle(slot: OddsMap, values) -> None:
+        for val in values:
+            if _OVER05_RE.search(val.get("value") or ""):
+                _put_max(slot, key, val.get("odd"))
+    return handle
+
+MARKET_HANDLERS: Dict[str, Callable[[OddsMap, Any], None]] = {
+    "match_winner": _h_match_winner,
+    "double_chance": _h_double_chance,
+    "btts": _h_btts,
+    "ou": _h_over_under,
+    "ou_1st": _over05_handler(("1st Half Goals", "Over 0.5")),
+    "ttg_home": _over05_handler(("Home Team Goals", "Over 0.5")),
+    "ttg_away": _over05_handler(("Away Team Goals", "Over 0.5")),
+}
 
-def _collect_odds_table(items: list) -> Dict[int, Dict[str, Dict[str, float]]]:
-    out: Dict[int, Dict[str, Dict[str,float]]] = {}
-    for it in items or []:
-        fx = (it.get("fixture") or {}).get("id") or (it.get("fixture") or {}).get("fixture")
+def _collect_odds_table(items: list) -> Dict[int, OddsMap]:
+    out: Dict[int, OddsMap] = {}
+    for it in items or ():
+        fxo = it.get("fixture") or _EMPTY
+        fx = fxo.get("id") or fxo.get("fixture")
         if not fx:
             continue
         fid = int(fx)
-        slot = out.setdefault(fid, {})
-
-        for bm in it.get("bookmakers",[]) or []:
-            # new format
-            for m in bm.get("markets",[]) or []:
+        slot: OddsMap = out.setdefault(fid, {})
+        books: Dict[Tuple[str, str], int] = {}
+
+        for bm in it.get("bookmakers") or ():
+            # Stop once every market a ticket can use has been priced by enough bookmakers.
+            if ODDS_MIN_BOOKS and all(books.get(k, 0) >= ODDS_MIN_BOOKS for k in WANTED_MARKETS):
+                break
+            bm_odds: OddsMap = {}
+            # new format: names are already canonical, so keep only keys a ticket can pick
+            for m in bm.get("markets") or ():
                 mkt = (m.get("name") or "").strip()
-                if not mkt:
+                if mkt not in _WANTED_MARKET_NAMES:
                     continue
-                dst = slot.setdefault(mkt, {})
-                for oc in m.get("outcomes",[]) or []:
-                    name = (oc.get("name") or "").strip()
-                    odd  = oc.get("price") if oc.get("price") is not None else oc.get("odd")
-                    v = _try_float(odd)
-                    if v is None: 
-                        continue
-                    if name and (name not in dst or v > dst[name]):
-                        dst[name] = v
+                for oc in m.get("outcomes") or ():
+                    key = (mkt, (oc.get("name") or "").strip())
+                    if key in WANTED_MARKETS:
+                        price = oc.get("price")
+                        _put_max(bm_odds, key, price if price is not None else oc.get("odd"))
 
             # old format
-            for bet in bm.get("bets",[]) or []:
-                raw = (bet.get("name") or "").strip()
-                if not raw:
-                    continue
+            for bet in bm.get("bets") or ():
+                # Anything outside the handled aliases (corners, cards, Asian lines, ...) is noise.
+                handler = MARKET_HANDLERS.get(_BETNAME_TO_KIND.get((bet.get("name") or "").strip().lower()))
+                if handler is not None:
+                    handler(bm_odds, bet.get("values") or ())
 
-                # Filter noise
-                if not _is_fulltime_main(raw):
-                    continue
-
-                # Map key markets
-                def add(dst_name, value_name, odd):
-                    dst = slot.setdefault(dst_name, {})
-                    v = _try_float(odd)
-                    if v is not None:
-                        cur = dst.get(value_name)
-                        if cur is None or v > cur:
-                            dst[value_name] = v
-
-                if raw in DOC_MARKETS["match_winner"]:
-                    for val in bet.get("values",[]) or []:
-                        nm=(val.get("value") or "").strip()
-                        if nm in ("Home","1"):
-                            add("Match Winner","Home", val.get("odd"))
-                        elif nm in ("Away","2"):
-                            add("Match Winner","Away", val.get("odd"))
-                    continue
-
-                if raw in DOC_MARKETS["double_chance"]:
-                    for val in bet.get("values",[]) or []:
-                        nm=(val.get("value") or "").replace(" ","").upper()
-                        if nm in {"1X","X2","12"}:
-                            add("Double Chance", nm, val.get("odd"))
-                    continue
-
-                if raw in DOC_MARKETS["btts"]:
-                    for val in bet.get("values",[]) or []:
-                        nm=(val.get("value") or "").strip().title()
-                        if nm in {"Yes","No"}:
-                            add("Both Teams To Score", nm, val.get("odd"))
-                    continue
-
-                if raw in DOC_MARKETS["ou"]:
-                    for val in bet.get("values",[]) or []:
-                        nm=(val.get("value") or "").strip().title().replace("Over1.5","Over 1.5").replace("Under3.5","Under 3.5").replace("Over2.5","Over 2.5")
-                        if nm in {"Over 1.5","Under 3.5","Over 2.5"}:
-                            add("Over/Under", nm, val.get("odd"))
-                    continue
-
-                if raw in DOC_MARKETS["ou_1st"]:
-                    for val in bet.get("values",[]) or []:
-                        nm=(val.get("value") or "")
-                        if re.search(r"(?i)over\\s*0\\.5", nm or ""):
-                            add("1st Half Goals", "Over 0.5", val.get("odd"))
-                    continue
-
-                if raw in DOC_MARKETS["ttg_home"]:
-                    for val in bet.get("values",[]) or []:
-                        nm=(val.get("value") or "")
-                        if re.search(r"(?i)over\\s*0\\.5", nm or ""):
-                            add("Home Team Goals","Over 0.5", val.get("odd"))
-                    continue
-
-                if raw in DOC_MARKETS["ttg_away"]:
-                    for val in bet.get("values",[]) or []:
-                        nm=(val.get("value") or "")
-                        if re.search(r"(?i)over\\s*0\\.5", nm or ""):
-                            add("Away Team Goals","Over 0.5", val.get("odd"))
-                    continue
+            for key, v in bm_odds.items():
+                books[key] = books.get(key, 0) + 1
+                if v > slot.get(key, 0.0):
+                    slot[key] = v
 
     return out
 
-_ODDS_BY_DATE_CACHE: dict[str, dict[int, dict[str, dict[str, float]]]] = {}
-
-def _odds_by_date(date_str: str) -> dict[int, dict[str, dict[str, float]]]:
-    if date_str in _ODDS_BY_DATE_CACHE:
-        return _ODDS_BY_DATE_CACHE[date_str]
-    data = _get("/odds", {"date": date_str})
+# Bounded: a run only needs the current date, so older tables are evicted instead of kept around.
+@lru_cache(maxsize=2)
+def _odds_by_date(date_str: str) -> Dict[int, OddsMap]:
+    data = _get("/odds", {"date": date_str}, memo=False)
     items = data.get("response", []) or []
-    dbg(f"Odds-by-date: items={len(items)}")
-    table = _collect_odds_table(items)
-    _ODDS_BY_DATE_CACHE[date_str] = table
-    return table
+    log.debug("Odds-by-date: items=%d", len(items))
+    return _collect_odds_table(items)
 
-def odds_by_fixture(fid: int, date_hint: Optional[str]) -> Dict[str, Dict[str, float]]:
-    data = _get("/odds", {"fixture": fid})
+@lru_cache(maxsize=4096)
+def odds_by_fixture(fid: int) -> Mapping[Tuple[str, str], float]:
+    """Memoized, read-only odds view for one fixture (shared by both tickets)."""
+    data = _get("/odds", {"fixture": fid}, memo=False)
     items = data.get("response", []) or []
-    if items:
-        table = _collect_odds_table(items)
-        return table.get(fid) or {}
-    if date_hint:
-        return _odds_by_date(date_hint).get(fid) or {}
-    return {}
-
-def fixtures_by_date(date_str: str) -> List[Dict[str, Any]]:
+    return MappingProxyType(_collect_odds_table(items).get(fid) or {})
+
+def _try_odds_by_date(date_str: str) -> Dict[int, OddsMap]:
+    # The date-wide table only saves per-fixture calls; without it every fixture falls back to one.
+    try:
+        return _odds_by_date(date_str)
+    except (RuntimeError, httpx.HTTPError) as exc:
+        log.warning("Odds-by-date failed for %s, using per-fixture odds: %s", date_str, exc)
+        return {}
+
+# Fixtures whose odds call failed in this build. lru_cache only keeps successes, so
+# without this ticket #2 would retry (and back off on) every failure from ticket #1.
+_odds_failed: set[int] = set()
+_odds_failed_lock = threading.Lock()
+
+def _try_odds_by_fixture(fid: int) -> Optional[Mapping[Tuple[str, str], float]]:
+    # One fixture's failed odds call should cost that fixture, not the whole batch.
+    with _odds_failed_lock:
+        if fid in _odds_failed:
+            return None
+    try:
+        return odds_by_fixture(fid)
+    except (RuntimeError, httpx.HTTPError) as exc:
+        log.debug("Odds fetch failed for fixture %s: %s", fid, exc)
+        with _odds_failed_lock:
+            _odds_failed.add(fid)
+        return None
+
+_odds_claimed: set[int] = set()
+_odds_claimed_lock = threading.Lock()
+
+def _reset_odds_run() -> None:
+    """Forget per-build odds bookkeeping so each build starts clean (and with a full ODDS_CALL_BUDGET)."""
+    with _odds_failed_lock:
+        _odds_failed.clear()
+    with _odds_claimed_lock:
+        _odds_claimed.clear()
+
+def _claim_odds_call(fid: int) -> bool:
+    """Reserve a per-fixture /odds call; False once ODDS_CALL_BUDGET distinct fixtures were fetched."""
+    with _odds_claimed_lock:
+        if fid in _odds_claimed:
+            return True
+        if ODDS_CALL_BUDGET and len(_odds_claimed) >= ODDS_CALL_BUDGET:
+            log.debug("Odds budget spent (%d calls); skipping fixture %s", ODDS_CALL_BUDGET, fid)
+            return False
+        _odds_claimed.add(fid)
+        return True
+
+def _iter_with_odds(fixtures: List[Fixture], odds_table: Dict[int, OddsMap]):
+    """Yield (fixture, odds) pairs, fetching missing odds ODDS_WORKERS fixtures at a time.
+
+    The date-wide table is consulted first; only fixtures missing from it cost a call.
+    Lazy on purpose: a caller that stops early leaves later batches unfetched.
+    Fixtures whose odds could not be fetched are skipped.
+    """
+    for i in range(0, len(fixtures), ODDS_WORKERS):
+        batch = fixtures[i:i+ODDS_WORKERS]
+        fids = [f.fid for f in batch]
+        # A fixture listed in the table is covered even if none of its markets are wanted.
+        usable = [fid in odds_table or _claim_odds_call(fid) for fid in fids]
+        missing = [fid for fid, ok in zip(fids, usable) if ok and fid not in odds_table]
+        fetched: Dict[int, Optional[Mapping[Tuple[str, str], float]]] = {}
+        if len(missing) > 1:
+            # Overlap the network round-trips; _bucket still enforces the request rate.
+            with ThreadPoolExecutor(max_workers=len(missing)) as ex:
+                fetched = dict(zip(missing, ex.map(_try_odds_by_fixture, missing)))
+        elif missing:
+            fetched = {missing[0]: _try_odds_by_fixture(missing[0])}
+        for f, fid, ok in zip(batch, fids, usable):
+            odds = (odds_table[fid] if fid in odds_table else fetched.get(fid)) if ok else None
+            if odds is not None:
+                yield f, odds
+
+class Fixture(NamedTuple):
+    """Flat view of one /fixtures item; built once so later stages skip nested dict walks."""
+    fid: int
+    league_id: Optional[int]
+    country: str
+    league: str
+    home: str
+    away: str
+    when: str
+    status: str
+
+def _to_fixture(f: Dict[str, Any]) -> Fixture:
+    fx = f.get("fixture") or _EMPTY
+    lg = f.get("league") or _EMPTY
+    tm = f.get("teams") or _EMPTY
+    return Fixture(
+        fid=int(fx.get("id")),
+        league_id=lg.get("id"),
+        country=lg.get("country") or "",
+        league=lg.get("name") or "",
+        home=(tm.get("home") or _EMPTY).get("name") or "",
+        away=(tm.get("away") or _EMPTY).get("name") or "",
+        when=_fmt_dt_local(fx.get("date") or ""),
+        status=(fx.get("status") or _EMPTY).get("short") or "",
+    )
+
+def fixtures_by_date(date_str: str) -> List[Fixture]:
     data = _get("/fixtures", {"date": date_str})
     resp = data.get("response") or []
-    out = []
+    out: List[Fixture] = []
     skipped = 0
     for f in resp:
-        fx = f.get("fixture",{}) or {}
-        st = (fx.get("status") or {}).get("short","")
-        if st in SKIP_STATUS:
+        # Check status on the raw item so finished/cancelled games are never flattened.
+        fx = f.get("fixture") or _EMPTY
+        status = fx.get("status")
+        st = status.get("short", "") if status else ""
+        if st in SKIP_STATUS or not fx.get("id"):
             skipped += 1
             continue
-        out.append(f)
+        out.append(_to_fixture(f))
         if len(out) >= MAX_MATCHES:
             break
-    dbg(f"Fixtures: total={len(resp)} usable={len(out)} skipped={skipped}")
+    log.debug("Fixtures: total=%d usable=%d skipped=%d", len(resp), len(out), skipped)
     return out
 
-def _ticket_line(f: Dict[str,Any], pick: Tuple[str,str,float]) -> Dict[str,Any]:
-    fx = f.get("fixture",{}) or {}
-    lg = f.get("league",{}) or {}
-    tm = f.get("teams",{}) or {}
-    when = _fmt_dt_local(fx.get("date",""))
-    home = (tm.get("home") or {}).get("name","")
-    away = (tm.get("away") or {}).get("name","")
+class Leg(NamedTuple):
+    """One pick on a fixture; rendered to text only if it makes it onto a ticket."""
+    fid: int
+    league_id: Optional[int]
+    country: str
+    league: str
+    home: str
+    away: str
+    when: str
+    market: str
+    value: str
+    odd: float
+
+_LEG_TMPL = "🏟 {country} — {league}\n⚽ {home} vs {away}\n⏰ {when}\n• {mkt} → {name}: {odd:.2f}"
+
+def _make_leg(f: Fixture, pick: Tuple[str,str,float]) -> Leg:
     mkt,name,odd = pick
-    return {
-        "league": f"🏟 {lg.get('country','')} — {lg.get('name','')}",
-        "teams":  f"⚽ {home} vs {away}",
-        "time":   f"⏰ {when}",
-        "pick":   f"• {mkt} → {name}: {odd:.2f}",
-        "odd": float(odd),
-        "league_id": lg.get("id"),
-    }
-
-def _best_from_bands(odds_map: Dict[str, Dict[str, float]], bands: Dict[Tuple[str,str], Tuple[float,float]]):
-    best=None; best_odd=0.0
-    for (mkt,name),(lo,hi) in bands.items():
-        v=(odds_map.get(mkt) or {}).get(name)
-        if v is None: 
-            continue
-        v=float(v)
-        if lo <= v <= hi and v > best_odd:
-            best, best_odd = (mkt,name,v), v
-    return best
-
-def _best_from_caps(odds_map: Dict[str, Dict[str, float]], caps: Dict[Tuple[str,str], float]):
-    best=None; best_odd=0.0
-    for (mkt,name),cap in caps.items():
-        v=(odds_map.get(mkt) or {}).get(name)
-        if v is None: 
-            continue
-        v=float(v)
-        if v <= cap and v > best_odd:
-            best, best_odd = (mkt,name,v), v
-    return best
-
-def assemble_ticket1(date_str: str) -> Dict[str, Any]:
-    fixtures = fixtures_by_date(date_str)
-    allow_fixtures = [f for f in fixtures if (f.get("league") or {}).get("id") in ALLOW_IDS]
-    dbg(f"T1 scan_order: prio={len(allow_fixtures)} rest={len(fixtures)-len(allow_fixtures)} total={len(fixtures)}")
-
-    pool: List[Dict[str,Any]] = []
-    for f in allow_fixtures:
-        fid=int((f.get("fixture") or {}).get("id"))
-        odds = odds_by_fixture(fid, date_str)
-        p = _best_from_bands(odds, MARKET_BANDS)
-        if p: pool.append(_ticket_line(f,p))
-
-    if len(pool) < LEGS_MIN:
-        for f in allow_fixtures:
-            fid=int((f.get("fixture") or {}).get("id"))
-            odds = odds_by_fixture(fid, date_str)
-            p = _best_from_bands(odds, RELAXED_BANDS)
-            if p: pool.append(_ticket_line(f,p))
-
-    if len(pool) < LEGS_MIN:
-        for f in fixtures:
-            if f in allow_fixtures: continue
-            fid=int((f.get("fixture") or {}).get("id"))
-            odds = odds_by_fixture(fid, date_str)
-            p = _best_from_bands(odds, MARKET_BANDS)
-            if p: pool.append(_ticket_line(f,p))
-
-    if len(pool) < LEGS_MIN:
-        for f in fixtures:
-            fid=int((f.get("fixture") or {}).get("id"))
-            odds = odds_by_fixture(fid, date_str)
-            p = _best_from_bands(odds, RELAXED_BANDS)
-            if p: pool.append(_ticket_line(f,p))
-
-    pool = sorted(pool, key=lambda L: L["odd"], reverse=True)
-
-    ticket: List[Dict[str,Any]] = []
+    return Leg(f.fid, f.league_id, f.country, f.league, f.home, f.away, f.when, mkt, name, float(odd))
+
+def _format_leg(L: Leg) -> str:
+    return _LEG_TMPL.format(country=L.country, league=L.league, home=L.home, away=L.away,
+                            when=L.when, mkt=L.market, name=L.value, odd=L.odd)
+
+def _format_ticket(title: str, date_str: str, legs: List[Leg], total: float) -> str:
+    buf = io.StringIO()
+    w = buf.write
+    w(f"{title}\n📅 {date_str}\n\n")
+    for L in legs:
+        w(_format_leg(L)); w("\n\n")
+    w(f"📈 Ukupno: {total:.2f}")
+    return buf.getvalue()
+
+def _best_from_bands(odds_map: Mapping[Tuple[str, str], float], bands: Tuple[Tuple[Tuple[str,str], Tuple[float,float]], ...]):
+    best_key=None; best_odd=0.0
+    for key,(lo,hi) in bands:
+        v=odds_map.get(key)
+        if v is not None and lo <= v <= hi and v > best_odd:
+            best_key, best_odd = key, v
+            if v >= EARLY_ACCEPT * hi:
+                break
+    return (*best_key, best_odd) if best_key else None
+
+def _best_from_caps(odds_map: Mapping[Tuple[str, str], float], caps: Tuple[Tuple[Tuple[str,str], float], ...]):
+    best_key=None; best_odd=0.0
+    for key,cap in caps:
+        v=odds_map.get(key)
+        if v is not None and best_odd < v <= cap:
+            best_key, best_odd = key, v
+    return (*best_key, best_odd) if best_key else None
+
+def _enough_legs(pool: List[Leg], target: float) -> bool:
+    """True once the pool has 2×LEGS_MAX legs and its best LEGS_MAX already beat `target` with margin."""
+    if len(pool) < LEGS_MAX * 2:
+        return False
+    top = heapq.nlargest(LEGS_MAX, (L.odd for L in pool))
+    return math.prod(top) >= target * EARLY_EXIT_MARGIN
+
+_BY_ODD = attrgetter("odd")
+
+def _build_ticket(pool: List[Leg], target: float) -> Tuple[List[Leg], float]:
+    """Take legs in pool order until `target` is reached with at least LEGS_MIN legs.
+
+    Beyond LEGS_MAX the lowest odd is dropped again, so an ascending pool can still
+    climb to the target on its longer prices. `total` is kept incrementally.
+    """
+    # Min-heap on odd; on a tied odd the later leg (larger seq, smaller -seq) is dropped
+    # first, so earlier pool entries win ties. -seq also restores pool order at the end.
+    heap: List[Tuple[float, int, Leg]] = []
     total = 1.0
-    for leg in pool:
-        if len(ticket) >= LEGS_MAX: break
-        ticket.append(leg); total *= leg["odd"]
-        if len(ticket) >= LEGS_MIN and total >= 2.0: break
+    for seq, leg in enumerate(pool):
+        heapq.heappush(heap, (leg.odd, -seq, leg)); total *= leg.odd
+        if len(heap) > LEGS_MAX:
+            total /= heapq.heappop(heap)[0]
+        if len(heap) >= LEGS_MIN and total >= target: break
+    return [leg for _, _, leg in sorted(heap, key=itemgetter(1), reverse=True)], total
+
+def _scan_bands(group: List[Fixture], odds_table: Dict[int, OddsMap], have: List[Leg]) -> Tuple[List[Leg], List[Leg]]:
+    """Strict and relaxed band legs for `group`; the relaxed band is only tried where the strict one misses.
+
+    Stops early once `have` plus the strict legs can already fill ticket #1.
+    """
+    strict: List[Leg] = []
+    relaxed: List[Leg] = []
+    for f, odds in _iter_with_odds(group, odds_table):
+        p = _best_from_bands(odds, _BAND_ITEMS)
+        if p:
+            strict.append(_make_leg(f,p))
+            if _enough_legs(have + strict, MIN_T1_TOTAL): break
+            continue
+        p = _best_from_bands(odds, _RELAXED_BAND_ITEMS)
+        if p: relaxed.append(_make_leg(f,p))
+    return strict, relaxed
 
-    if len(ticket) < LEGS_MIN:
-        dbg("T1 not built: insufficient legs")
-        return {"legs": [], "text": ""}
+def assemble_ticket1(date_str: str, fixtures: List[Fixture], odds_table: Dict[int, OddsMap]) -> Dict[str, Any]:
+    allow_fixtures: List[Fixture] = []
+    rest: List[Fixture] = []
+    for f in fixtures:
+        (allow_fixtures if _league_in_prio(f) else rest).append(f)
+    log.debug("T1 scan_order: prio=%d rest=%d total=%d", len(allow_fixtures), len(rest), len(fixtures))
+
+    # Tiers in order: priority strict, priority relaxed, rest strict, rest relaxed; each
+    # later tier is used only while the pool is still short of LEGS_MIN. One pass per
+    # group scores both bands, so a fixture's odds are read once.
+    pool: List[Leg] = []
+    for group in (allow_fixtures, rest):
+        strict, relaxed = _scan_bands(group, odds_table, pool)
+        pool += strict
+        if len(pool) < LEGS_MIN:
+            pool += relaxed
+        if len(pool) >= LEGS_MIN:
+            break
 
-    lines = ["🎟 Ticket #1 — Stabilni bandovi", f"📅 {date_str}", ""]
-    for l in ticket: lines += [l["league"], l["teams"], l["time"], l["pick"], ""]
-    lines.append(f"📈 Ukupno: {total:.2f}")
-    return {"legs": ticket, "text": "\n".join(lines)}
+    # On a descending pool _build_ticket keeps a prefix of at most LEGS_MAX legs (later
+    # ties lose), and nlargest orders like a stable descending sort, so the top LEGS_MAX suffice.
+    pool = heapq.nlargest(LEGS_MAX, pool, key=_BY_ODD)
 
-def assemble_ticket2_allow_all(date_str: str) -> Dict[str, Any]:
-    fixtures = fixtures_by_date(date_str)
+    ticket, total = _build_ticket(pool, MIN_T1_TOTAL)
 
-    pool: List[Dict[str,Any]] = []
-    for f in fixtures:
-        fid=int((f.get("fixture") or {}).get("id"))
-        odds = odds_by_fixture(fid, date_str)
-        p = _best_from_caps(odds, ALLOW_ALL_CAPS_HARD)
-        if p: pool.append(_ticket_line(f,p))
+    if len(ticket) < LEGS_MIN:
+        log.debug("T1 not built: insufficient legs")
+        return {"legs": [], "text": ""}
 
-    if not pool:
-        for f in fixtures:
-            fid=int((f.get("fixture") or {}).get("id"))
-            odds = odds_by_fixture(fid, date_str)
-            p = _best_from_caps(odds, ALLOW_ALL_CAPS_RELAX)
-            if p: pool.append(_ticket_line(f,p))
+    return {"legs": ticket, "text": _format_ticket("🎟 Ticket #1 — Stabilni bandovi", date_str, ticket, total)}
+
+def assemble_ticket2_allow_all(date_str: str, fixtures: List[Fixture], odds_table: Dict[int, OddsMap]) -> Dict[str, Any]:
+    strict: List[Leg] = []
+    relaxed: List[Leg] = []
+    for f, odds in _iter_with_odds(fixtures, odds_table):
+        p = _best_from_caps(odds, _CAP_ITEMS_HARD)
+        if p:
+            strict.append(_make_leg(f,p))
+            if _enough_legs(strict, MIN_T2_TOTAL): break
+            continue
+        p = _best_from_caps(odds, _CAP_ITEMS_RELAX)
+        if p: relaxed.append(_make_leg(f,p))
 
+    pool = strict or relaxed
     if not pool:
-        dbg("T2 no legs found at all")
+        log.debug("T2 no legs found at all")
         return {"legs": [], "text": ""}
 
-    pool = sorted(pool, key=lambda L: L["odd"])
+    pool.sort(key=_BY_ODD)
 
-    ticket: List[Dict[str,Any]] = []
-    total = 1.0
-    for leg in pool:
-        if len(ticket) >= LEGS_MAX: break
-        ticket.append(leg); total *= leg["odd"]
-        if len(ticket) >= LEGS_MIN and total >= 1.85: break
-
-    if total < 1.85 or len(ticket) < LEGS_MIN:
-        for leg in sorted(pool, key=lambda L: L["odd"], reverse=True):
-            if leg in ticket: continue
-            if len(ticket) >= LEGS_MAX: break
-            ticket.append(leg); total *= leg["odd"]
-            if total >= 1.85 and len(ticket) >= LEGS_MIN: break
-
-    if total < 1.85 or len(ticket) < LEGS_MIN:
-        dbg(f"T2 not built: pool={len(pool)} legs={len(ticket)} total={total:.2f}")
+    ticket, total = _build_ticket(pool, MIN_T2_TOTAL)
+
+    if total < MIN_T2_TOTAL or len(ticket) < LEGS_MIN:
+        log.debug("T2 not built: pool=%d legs=%d total=%.2f", len(pool), len(ticket), total)
         return {"legs": [], "text": ""}
 
-    lines = ["🎟 Ticket #2 — Allow-all caps", f"📅 {date_str}", ""]
-    for l in ticket: lines += [l["league"], l["teams"], l["time"], l["pick"], ""]
-    lines.append(f"📈 Ukupno: {total:.2f}")
-    return {"legs": ticket, "text": "\n".join(lines)}
+    return {"legs": ticket, "text": _format_ticket("🎟 Ticket #2 — Allow-all caps", date_str, ticket, total)}
 
 # ===== OPENAI reasoning (optional; degrade gracefully) =====
+_openai_lock = threading.Lock()
+_openai: Any = None
+
+def _openai_client() -> Any:
+    """One OpenAI client (and connection pool) for the process; imported lazily."""
+    global _openai
+    with _openai_lock:
+        if _openai is None:
+            from openai import OpenAI
+            _openai = OpenAI(api_key=OPENAI_KEY)
+        return _openai
+
+# Same ticket text, model and settings -> same answer; re-runs within a day reuse it.
+REASONING_CACHE_TTL = 86400
+# Above this, sampling is meant to vary between runs, so answers are not cached.
+REASONING_CACHE_MAX_TEMPERATURE = 0.4
+
 def _reasoning_for(text: str) -> str:
     if not OPENAI_KEY:
         return "Model reasoning unavailable. OPENAI_API_KEY not set."
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_KEY)
         prompt = (
             "Give a concise analyst-style rationale for this soccer betslip. "
             "Explain the selection logic without claiming certainty. Keep it under 120 words.\\n\\n"
             + text
         )
-        resp = client.chat.completions.create(
+        messages = [{"role":"user","content":prompt}]
+        cacheable = OPENAI_TEMPERATURE <= REASONING_CACHE_MAX_TEMPERATURE
+        key = ("openai", OPENAI_MODEL, OPENAI_TEMPERATURE, repr(messages))
+        cached = _disk_load(key, REASONING_CACHE_TTL) if cacheable else None
+        if cached is not None:
+            return cached
+        resp = _openai_client().chat.completions.create(
             model=OPENAI_MODEL,
-            messages=[{"role":"user","content":prompt}],
-            temperature=0.3,
+            messages=messages,
+            temperature=OPENAI_TEMPERATURE,
             max_tokens=180,
         )
-        return resp.choices[0].message.content.strip()
+        out = resp.choices[0].message.content.strip()
+        if cacheable:
+            _disk_store(key, out)
+        return out
     except Exception as e:
         return f"LLM reasoning unavailable: {e}"
 
@@ -504,14 +841,29 @@ def _reasoning_for(text: str) -> str:
 def build_tickets_and_reasoning(date_str: Optional[str] = None, debug: bool = False) -> Tuple[List[str], List[str]]:
     if not date_str:
         date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    dbg(f"=== build_tickets_and_reasoning date={date_str} ===")
-
-    t1 = assemble_ticket1(date_str)
-    t2 = assemble_ticket2_allow_all(date_str)
-
-    tickets_texts: List[str] = [t["text"] for t in (t1,t2) if t.get("text")]
-    reasonings: List[str] = [_reasoning_for(t) for t in tickets_texts]
-    dbg(f"RESULT tickets={len(tickets_texts)}")
+    log.debug("=== build_tickets_and_reasoning date=%s ===", date_str)
+    _reset_odds_run()
+
+    # Fixtures and the date-wide odds table are fetched once and shared by both tickets;
+    # per-fixture odds are memoized, so a fixture scanned by both costs one lookup.
+    # The two listings are independent, so their round-trips overlap.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        odds_future = ex.submit(_try_odds_by_date, date_str)
+        fixtures = fixtures_by_date(date_str)
+        odds_table = odds_future.result()
+
+    # Each ticket's reasoning call starts as soon as the ticket exists, so the
+    # OpenAI round-trip for #1 overlaps assembling #2 (and its odds fetches).
+    tickets_texts: List[str] = []
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        pending = []
+        for assemble in (assemble_ticket1, assemble_ticket2_allow_all):
+            text = assemble(date_str, fixtures, odds_table).get("text")
+            if text:
+                tickets_texts.append(text)
+                pending.append(ex.submit(_reasoning_for, text))
+        reasonings: List[str] = [fut.result() for fut in pending]
+    log.debug("RESULT tickets=%d", len(tickets_texts))
     return tickets_texts, reasonings
 
 # ===== Telegram posting with expected signature =====
@@ -520,10 +872,10 @@ def _chunk_telegram(text: str, limit: int = 4096) -> List[str]:
         return [text]
     chunks=[]; buf=text
     while len(buf) > limit:
-        cut = buf.rfind("\\n", 0, limit)
+        cut = buf.rfind("\n", 0, limit)
         if cut == -1: cut = limit
         chunks.append(buf[:cut].rstrip())
-        buf = buf[cut:].lstrip("\\n")
+        buf = buf[cut:].lstrip("\n")
     if buf: chunks.append(buf)
     return chunks
 
@@ -537,15 +889,28 @@ def post_to_telegram(message: str, channel: Optional[str] = None, *, token: Opti
 
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     last={}
-    with httpx.Client(timeout=30) as c:
-        for i, part in enumerate(_chunk_telegram(message), 1):
-            payload = {"chat_id": chat_id, "text": (f"[{i}/%d]\\n" % len(_chunk_telegram(message))) + part if i>1 else part,
-                       "parse_mode":"HTML","disable_web_page_preview": True}
-            r = c.post(url, json=payload)
-            try:
-                r.raise_for_status()
-                last = r.json()
-            except Exception as e:
-                return False, {"error": str(e), "status": r.status_code, "body": r.text[:300]}
+    c = _shared_client("telegram", timeout=30)
+    parts = _chunk_telegram(message)
+    if len(parts) > 1:
+        # Leave room for the "[i/n]" prefix on continuation parts.
+        parts = _chunk_telegram(message, 4096 - 16)
+    for i, part in enumerate(parts, 1):
+        if i > 1:
             time.sleep(0.5)
+        payload = {"chat_id": chat_id, "text": f"[{i}/{len(parts)}]\n{part}" if i>1 else part,
+                   "parse_mode":"HTML","disable_web_page_preview": True}
+        r = c.post(url, content=_json_dumps(payload), headers={"Content-Type": "application/json"})
+        try:
+            r.raise_for_status()
+            last = r.json()
+        except Exception as e:
+            return False, {"error": str(e), "status": r.status_code, "body": r.text[:300]}
     return True, last
+
+def post_to_channels(message: str, channels: List[str], *, token: Optional[str] = None) -> List[Tuple[str, bool, Dict]]:
+    """Post `message` to every channel at once; returns (channel, ok, resp) in input order."""
+    if not channels:
+        return []
+    with ThreadPoolExecutor(max_workers=len(channels)) as ex:
+        results = list(ex.map(lambda ch: post_to_telegram(message, ch, token=token), channels))
+    return [(ch, ok, resp) for ch, (ok, resp) in zip(channels, results)]